@@ -5,53 +5,100 @@ allowing easy switching between different providers via environment variables.
 """
 
 import os
+import types
+from collections.abc import Mapping
+from dataclasses import dataclass
 
 
-class Config:
-    """Configuration manager for the multi-agent workflow."""
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Read-only configuration values for the multi-agent workflow."""
 
     # LLM Configuration
-    LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://69.48.159.10:30000/v1")
-    LLM_API_KEY = os.getenv("LLM_API_KEY", "not-needed")
-    LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.1-70b")
-    LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.1"))
+    LLM_BASE_URL: str
+    LLM_API_KEY: str
+    LLM_MODEL: str
+    LLM_TEMPERATURE: float
 
     # Embedding Configuration
-    EMBEDDING_BASE_URL = os.getenv("EMBEDDING_BASE_URL", "http://69.48.159.10:30001/v1")
-    EMBEDDING_API_KEY = os.getenv("EMBEDDING_API_KEY", "not-needed")
-    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "Nexus-bge-m3-opensearch-embeddings")
+    EMBEDDING_BASE_URL: str
+    EMBEDDING_API_KEY: str
+    EMBEDDING_MODEL: str
 
     # Model token limits (adjusted for 64k context length local LLM)
     # Using ~80% of context for output to leave room for input
-    MAX_TOKENS_DEFAULT = int(os.getenv("MAX_TOKENS_DEFAULT", "50000"))
-    MAX_TOKENS_WRITER = int(os.getenv("MAX_TOKENS_WRITER", "55000"))
+    MAX_TOKENS_DEFAULT: int
+    MAX_TOKENS_WRITER: int
 
     # Context length for the local LLM
-    LLM_CONTEXT_LENGTH = int(os.getenv("LLM_CONTEXT_LENGTH", "64000"))
+    LLM_CONTEXT_LENGTH: int
 
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "Settings":
+        """Resolve every setting from an environment mapping.
 
-def get_model_config() -> dict:
+        Args:
+            env: Environment variables to read, e.g. a snapshot of ``os.environ``.
+
+        Returns:
+            Settings with defaults applied and numeric values cast.
+        """
+        return cls(
+            LLM_BASE_URL=env.get("LLM_BASE_URL", "http://69.48.159.10:30000/v1"),
+            LLM_API_KEY=env.get("LLM_API_KEY", "not-needed"),
+            LLM_MODEL=env.get("LLM_MODEL", "llama-3.1-70b"),
+            LLM_TEMPERATURE=float(env.get("LLM_TEMPERATURE", "0.1")),
+            EMBEDDING_BASE_URL=env.get("EMBEDDING_BASE_URL", "http://69.48.159.10:30001/v1"),
+            EMBEDDING_API_KEY=env.get("EMBEDDING_API_KEY", "not-needed"),
+            EMBEDDING_MODEL=env.get("EMBEDDING_MODEL", "Nexus-bge-m3-opensearch-embeddings"),
+            MAX_TOKENS_DEFAULT=int(env.get("MAX_TOKENS_DEFAULT", "50000")),
+            MAX_TOKENS_WRITER=int(env.get("MAX_TOKENS_WRITER", "55000")),
+            LLM_CONTEXT_LENGTH=int(env.get("LLM_CONTEXT_LENGTH", "64000")),
+        )
+
+
+# Configuration manager for the multi-agent workflow: resolved once at import
+# from a single snapshot of the environment, never re-read, and frozen, so
+# every caller shares this one instance
+Config = Settings.from_env(dict(os.environ))
+
+# Built once at import; shared, read-only views handed out to every caller
+_MODEL_CONFIG = types.MappingProxyType({
+    "model": f"openai:{Config.LLM_MODEL}",
+    "base_url": Config.LLM_BASE_URL,
+    "api_key": Config.LLM_API_KEY,
+    "temperature": Config.LLM_TEMPERATURE,
+})
+
+_EMBEDDING_CONFIG = types.MappingProxyType({
+    "model": Config.EMBEDDING_MODEL,
+    "base_url": Config.EMBEDDING_BASE_URL,
+    "api_key": Config.EMBEDDING_API_KEY,
+})
+
+
+def get_model_config() -> types.MappingProxyType:
     """Get the base configuration for initializing chat models.
 
+    Returns:
+        Read-only mapping with model configuration parameters.
+    """
+    return _MODEL_CONFIG
+
+
+def get_model_config_copy() -> dict:
+    """Get a mutable copy of the base chat model configuration.
+
     Returns:
         Dictionary with model configuration parameters.
     """
-    return {
-        "model": f"openai:{Config.LLM_MODEL}",
-        "base_url": Config.LLM_BASE_URL,
-        "api_key": Config.LLM_API_KEY,
-        "temperature": Config.LLM_TEMPERATURE,
-    }
+    return dict(_MODEL_CONFIG)
 
 
-def get_embedding_config() -> dict:
+def get_embedding_config() -> types.MappingProxyType:
     """Get the configuration for embedding models.
 
     Returns:
-        Dictionary with embedding configuration parameters.
+        Read-only mapping with embedding configuration parameters.
     """
-    return {
-        "model": Config.EMBEDDING_MODEL,
-        "base_url": Config.EMBEDDING_BASE_URL,
-        "api_key": Config.EMBEDDING_API_KEY,
-    }
+    return _EMBEDDING_CONFIG
@@ -1,28 +1,76 @@
 """Test script for the local LLM pipeline with streaming and graph visualization."""
 
+import argparse
 import asyncio
+import functools
 import os
+import sys
 import warnings
 from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
 
-# Set environment variables
-os.environ["TAVILY_API_KEY"] = "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"
+# Set environment variables (a key already in the environment takes precedence)
+os.environ.setdefault("TAVILY_API_KEY", "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")
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
 
-from langchain_core.messages import HumanMessage
-from langgraph.checkpoint.memory import InMemorySaver
+# Separators used in console output, built once
+SEP_EQ = "=" * 60
+SEP_DASH = "─" * 40
+HEADER = f"\n{SEP_DASH}\n"
 
-from deep_research.research_agent_full import deep_researcher_builder
+# Test query
+DEFAULT_QUERY = "What are the main LLM quantization methods? Compare GPTQ, AWQ, and GGUF formats."
 
 
-def save_graph_as_png(graph, filename: str = "workflow_graph.png"):
+def _fmt_brief(brief) -> str:
+    return f"   Research Brief: {brief[:300]}...\n" if len(brief) > 300 else f"   Research Brief: {brief}\n"
+
+
+def _fmt_draft(draft_report) -> str:
+    return f"   Draft Report Generated: {len(draft_report)} characters\n"
+
+
+def _fmt_findings(findings) -> str:
+    return f"   Research Findings: {len(findings)} findings collected\n"
+
+
+def _fmt_final(final_report) -> str:
+    return f"   ✅ Final Report Generated: {len(final_report)} characters\n"
+
+
+# State fields shown for each streamed node update, in display order
+FIELD_FORMATTERS = (
+    ("research_brief", _fmt_brief),
+    ("draft_report", _fmt_draft),
+    ("research_findings", _fmt_findings),
+    ("final_report", _fmt_final),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_agent():
+    """Compile the research agent once and reuse it for every run.
+
+    The checkpointer backs the ``aget_state`` fallback in ``main`` and is
+    shared by every run, so each run must use its own ``thread_id``.
+    """
+    # Heavy langchain/langgraph imports are deferred until a run actually needs them
+    from deep_research.research_agent_full import deep_researcher_builder
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    return deep_researcher_builder.compile(checkpointer=InMemorySaver())
+
+
+def save_graph_as_png(graph, filename: str = "workflow_graph.png", log=print):
     """Save the LangGraph workflow as a PNG image.
 
     Args:
         graph: Compiled LangGraph graph
         filename: Output filename for the PNG
+        log: Callable receiving each status message (defaults to ``print``)
     """
     try:
         # Get the graph and draw as PNG using mermaid
@@ -31,19 +79,19 @@ def save_graph_as_png(graph, filename: str = "workflow_graph.png"):
         with open(filename, "wb") as f:
             f.write(png_data)
 
-        print(f"Graph saved as '{filename}'")
+        log(f"Graph saved as '{filename}'")
         return True
     except Exception as e:
-        print(f"Could not save graph as PNG: {e}")
-        print("Falling back to Mermaid text representation...")
+        log(f"Could not save graph as PNG: {e}")
+        log("Falling back to Mermaid text representation...")
         try:
             mermaid_text = graph.get_graph().draw_mermaid()
             mermaid_filename = filename.replace(".png", ".mmd")
             with open(mermaid_filename, "w") as f:
                 f.write(mermaid_text)
-            print(f"Mermaid diagram saved as '{mermaid_filename}'")
+            log(f"Mermaid diagram saved as '{mermaid_filename}'")
         except Exception as e2:
-            print(f"Could not save Mermaid diagram: {e2}")
+            log(f"Could not save Mermaid diagram: {e2}")
         return False
 
 
@@ -55,64 +103,59 @@ async def run_with_streaming(graph, query: str, thread_config: dict):
         query: The research query
         thread_config: Thread configuration for checkpointing
     """
-    print("\n" + "=" * 60)
-    print("STREAMING WORKFLOW EXECUTION")
-    print("=" * 60 + "\n")
+    from langchain_core.messages import HumanMessage
+
+    sys.stdout.write(f"\n{SEP_EQ}\nSTREAMING WORKFLOW EXECUTION\n{SEP_EQ}\n\n")
 
     final_result = None
 
-    # Use astream to get updates as the workflow executes
+    # Use astream to get updates as the workflow executes. "updates" already
+    # yields only the keys each node wrote, so there is no snapshot to diff
+    # (unlike "values", which re-emits the full state after every step)
     async for event in graph.astream(
         {"messages": [HumanMessage(content=query)]},
         config=thread_config,
         stream_mode="updates"
     ):
+        # Collect everything printed for this event and write it in one go
+        parts: list[str] = []
+
         # event is a dict with node name as key and output as value
         for node_name, node_output in event.items():
-            print(f"\n{'─' * 40}")
-            print(f"📍 Node: {node_name}")
-            print(f"{'─' * 40}")
+            parts.append(f"{HEADER}📍 Node: {node_name}\n{SEP_DASH}\n")
 
             # Print relevant information from the node output
             if isinstance(node_output, dict):
                 # Check for messages
-                if "messages" in node_output:
-                    messages = node_output["messages"]
-                    if messages:
-                        last_msg = messages[-1] if isinstance(messages, list) else messages
-                        if hasattr(last_msg, "content"):
-                            content = last_msg.content
-                            # Truncate long content for display
-                            if len(content) > 500:
-                                print(f"   Content: {content[:500]}...")
-                            else:
-                                print(f"   Content: {content}")
-
-                # Check for research brief
-                if "research_brief" in node_output and node_output["research_brief"]:
-                    brief = node_output["research_brief"]
-                    print(f"   Research Brief: {brief[:300]}..." if len(brief) > 300 else f"   Research Brief: {brief}")
-
-                # Check for draft report
-                if "draft_report" in node_output and node_output["draft_report"]:
-                    print(f"   Draft Report Generated: {len(node_output['draft_report'])} characters")
-
-                # Check for research findings
-                if "research_findings" in node_output and node_output["research_findings"]:
-                    findings = node_output["research_findings"]
-                    print(f"   Research Findings: {len(findings)} findings collected")
-
-                # Check for final report
-                if "final_report" in node_output and node_output["final_report"]:
-                    print(f"   ✅ Final Report Generated: {len(node_output['final_report'])} characters")
+                messages = node_output.get("messages")
+                if messages:
+                    # Every node in this graph emits messages as a list
+                    last_msg = messages[-1]
+                    content = getattr(last_msg, "content", None)
+                    if content is not None:
+                        # Truncate long content for display
+                        truncated = content[:501]
+                        suffix = "..." if len(truncated) == 501 else ""
+                        parts.append(f"   Content: {truncated[:500]}{suffix}\n")
+
+                # Check for the state fields we report on
+                for key, fmt in FIELD_FORMATTERS:
+                    value = node_output.get(key)
+                    if value:
+                        parts.append(fmt(value))
+
+                if node_output.get("final_report"):
                     final_result = node_output
 
-            print()
+            parts.append("\n")
+
+        sys.stdout.write("".join(parts))
+        sys.stdout.flush()
 
     return final_result
 
 
-def save_report_to_file(report: str, query: str, filename: str = None) -> str:
+async def save_report_to_file(report: str, query: str, filename: str = None) -> str:
     """Save the final report to a markdown file.
 
     Args:
@@ -123,88 +166,102 @@ def save_report_to_file(report: str, query: str, filename: str = None) -> str:
     Returns:
         The filename where the report was saved
     """
+    now = datetime.now()
     if filename is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         filename = f"research_report_{timestamp}.md"
 
     # Create report with metadata header
     full_report = f"""---
 query: "{query}"
-generated_at: {datetime.now().isoformat()}
+generated_at: {now.isoformat()}
 ---
 
 {report}
 """
 
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(full_report)
+    # Write from a worker thread so large reports don't stall the event loop
+    await asyncio.to_thread(Path(filename).write_text, full_report, encoding="utf-8")
 
     return filename
 
 
-async def main():
-    """Run a test query through the research pipeline with streaming."""
-    print("=" * 60)
+async def main(query: str = DEFAULT_QUERY, save_report: bool = True):
+    """Run a test query through the research pipeline with streaming.
+
+    Args:
+        query: The research query to run
+        save_report: Whether to write the final report to a markdown file
+    """
+    print(SEP_EQ)
     print("Testing Local LLM Pipeline (Streaming Mode)")
-    print("=" * 60)
+    print(SEP_EQ)
 
     # Print configuration
     from deep_research.config import Config
-    print(f"\nConfiguration:")
-    print(f"  LLM Base URL: {Config.LLM_BASE_URL}")
-    print(f"  LLM Model: {Config.LLM_MODEL}")
-    print(f"  LLM Context Length: {Config.LLM_CONTEXT_LENGTH:,} tokens")
-    print(f"  Max Tokens (Default): {Config.MAX_TOKENS_DEFAULT:,}")
-    print(f"  Max Tokens (Writer): {Config.MAX_TOKENS_WRITER:,}")
-    print(f"  Embedding Base URL: {Config.EMBEDDING_BASE_URL}")
-    print(f"  Embedding Model: {Config.EMBEDDING_MODEL}")
-    print()
-
-    # Compile the agent with checkpointer
-    checkpointer = InMemorySaver()
-    full_agent = deep_researcher_builder.compile(checkpointer=checkpointer)
-
-    # Save the graph as PNG
-    print("Saving workflow graph...")
-    save_graph_as_png(full_agent, "workflow_graph.png")
-    print()
-
-    # Test query
-    query = "What are the main LLM quantization methods? Compare GPTQ, AWQ, and GGUF formats."
+    lines = [
+        f"  LLM Base URL: {Config.LLM_BASE_URL}",
+        f"  LLM Model: {Config.LLM_MODEL}",
+        f"  LLM Context Length: {Config.LLM_CONTEXT_LENGTH:,} tokens",
+        f"  Max Tokens (Default): {Config.MAX_TOKENS_DEFAULT:,}",
+        f"  Max Tokens (Writer): {Config.MAX_TOKENS_WRITER:,}",
+        f"  Embedding Base URL: {Config.EMBEDDING_BASE_URL}",
+        f"  Embedding Model: {Config.EMBEDDING_MODEL}",
+    ]
+    print("\nConfiguration:\n" + "\n".join(lines) + "\n")
+
+    # Compile (and first-import the agent modules) off the event loop
+    full_agent = await asyncio.to_thread(_get_agent)
+
+    # Save the graph as PNG in a worker thread; mermaid rendering is a blocking
+    # HTTP call, so let it overlap with the streamed run below. Its status
+    # messages are buffered and printed once streaming ends (successfully or
+    # not), so they don't interleave with the streamed output
+    print("Saving workflow graph in the background...\n")
+    png_log: list[str] = []
+    png_task = asyncio.create_task(
+        asyncio.to_thread(save_graph_as_png, full_agent, "workflow_graph.png", png_log.append)
+    )
 
     print(f"Query: {query}")
-    print("=" * 60)
+    print(SEP_EQ)
 
-    # Run the agent with streaming
-    thread = {"configurable": {"thread_id": "test-1", "recursion_limit": 50}}
+    # Run the agent with streaming. The compiled agent and its checkpointer are
+    # shared across runs, so each run gets its own thread to keep state isolated
+    thread = {"configurable": {"thread_id": uuid4().hex, "recursion_limit": 50}}
 
     try:
-        result = await run_with_streaming(full_agent, query, thread)
+        try:
+            result = await run_with_streaming(full_agent, query, thread)
+        finally:
+            # Report the render outcome whether or not streaming succeeded
+            await png_task
+            print("\n".join(png_log))
 
-        print("\n" + "=" * 60)
+        print("\n" + SEP_EQ)
         print("FINAL REPORT")
-        print("=" * 60)
+        print(SEP_EQ)
 
-        final_report = None
+        final_state = None
 
         if result and "final_report" in result:
             final_report = result["final_report"]
         else:
-            # Fallback: get the final state
+            # Fallback: load the checkpointed state only when the stream didn't carry the report
             final_state = await full_agent.aget_state(thread)
-            if final_state and final_state.values and "final_report" in final_state.values:
-                final_report = final_state.values["final_report"]
+            final_report = final_state.values.get("final_report") if final_state and final_state.values else None
 
         if final_report:
             print(final_report)
 
+        if final_report and save_report:
             # Save the report to a file
-            print("\n" + "=" * 60)
+            print("\n" + SEP_EQ)
             print("SAVING REPORT")
-            print("=" * 60)
-            report_filename = save_report_to_file(final_report, query)
+            print(SEP_EQ)
+            report_filename = await save_report_to_file(final_report, query)
             print(f"✅ Report saved to: {report_filename}")
-        else:
+        elif not final_report:
             print("No final report generated.")
             if final_state and final_state.values:
                 print("Available keys:", list(final_state.values.keys()))
@@ -215,5 +272,26 @@ async def main():
         traceback.print_exc()
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command-line options for the pipeline script.
+
+    Args:
+        argv: Argument list to parse (defaults to ``sys.argv[1:]``)
+
+    Returns:
+        Parsed options with ``query`` and ``save_report`` attributes
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="Research query to run")
+    parser.add_argument(
+        "--save-report",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Write the final report to a markdown file (default: on)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    asyncio.run(main(query=args.query, save_report=args.save_report))